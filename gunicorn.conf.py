@@ -0,0 +1,16 @@
+"""
+Gunicorn settings so concurrent uploads process in parallel instead of
+queueing behind Flask's single-threaded dev server.
+
+Run the apps in production with:
+    gunicorn -c gunicorn.conf.py app4_flask_SHEFI:app
+    gunicorn -c gunicorn.conf.py app_flask_UNEEK:app
+    gunicorn -c gunicorn.conf.py app5_pdf2excel:app
+"""
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_class = 'sync'
+# File processing can take a while on big uploads
+timeout = 120